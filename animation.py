@@ -0,0 +1,81 @@
+import time
+
+#============================ FRAME-BUDGETED SOLVE ANIMATION SCHEDULER =================================#
+
+def collapse_steps(steps):
+    # A placement followed by clearing the same cell is a no-op when the cell was empty before it, so
+    # backtracking dead ends disappear entirely; checking against the reduced list catches nested ones too.
+    kept = []
+    current = {}
+    for row, col, value in steps:
+        previous = current.get((row, col), 0)
+        if value == 0 and kept and kept[-1][:2] == (row, col) and kept[-1][3] == 0:
+            kept.pop()
+        else:
+            kept.append((row, col, value, previous))
+        current[(row, col)] = value
+    return [(row, col, value) for row, col, value, _ in kept]
+
+
+class SolveAnimator:
+    def __init__(self, steps, apply_step, step_delay=50, target_duration=3000, frame_budget=4, fast_speed=8):
+        self.raw_count = len(steps)
+        self.steps = collapse_steps(steps)
+        self.apply_step = apply_step
+        self.frame_budget = frame_budget / 1000
+        self.fast_speed = fast_speed
+        self.speed = 1
+        self.position = 0
+        self.credit = 0.0
+        self.last_tick = None
+        # Short solves keep the familiar one step per step_delay; long ones are sped up to fit target_duration.
+        # A step_delay of 0 applies steps as fast as the frame budget allows.
+        if step_delay <= 0:
+            self.rate = float("inf")
+        else:
+            self.rate = max(1 / step_delay, len(self.steps) / target_duration)
+
+    @property
+    def done(self):
+        return self.position >= len(self.steps)
+
+    @property
+    def fast_forwarding(self):
+        return self.speed != 1
+
+    def start(self, now):
+        self.last_tick = now
+
+    def toggle_fast_forward(self):
+        self.speed = 1 if self.fast_forwarding else self.fast_speed
+
+    def advance(self, now):
+        if self.last_tick is None:
+            self.last_tick = now
+        remaining = len(self.steps) - self.position
+        if self.rate == float("inf"):
+            self.credit = remaining
+        else:
+            self.credit = min(remaining, self.credit + (now - self.last_tick) * self.rate * self.speed)
+        self.last_tick = now
+
+        deadline = time.perf_counter() + self.frame_budget
+        applied = 0
+        while self.credit >= 1 and not self.done:
+            self.apply_step(*self.steps[self.position])
+            self.position += 1
+            self.credit -= 1
+            applied += 1
+            if time.perf_counter() >= deadline:
+                break
+        return applied
+
+    def skip(self):
+        # Only each cell's final value matters, so at most one write per cell regardless of how many steps remain.
+        final = {}
+        for row, col, value in self.steps[self.position:]:
+            final[(row, col)] = value
+        for (row, col), value in final.items():
+            self.apply_step(row, col, value)
+        self.position = len(self.steps)
+        self.credit = 0.0
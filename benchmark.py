@@ -0,0 +1,81 @@
+import argparse
+import os
+import random
+
+# The dummy drivers must be selected before pygame is initialised by the constants module.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+import constants as c
+from board_generator import SudokuBoardGenerator
+from game import SudokuGame
+from profiler import FrameProfiler
+
+#============================ HEADLESS GAME-LOOP FRAME-TIME BENCHMARK =================================#
+
+def cell_center(row, col):
+    start_x = (c.WINDOW_WIDTH - c.GRID_SIZE * c.CELL_SIZE) // 2
+    start_y = (c.WINDOW_HEIGHT - c.GRID_SIZE * c.CELL_SIZE) // 2
+    return start_x + col * c.CELL_SIZE + c.CELL_SIZE // 2, start_y + row * c.CELL_SIZE + c.CELL_SIZE // 2
+
+
+def click(pos):
+    pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1))
+
+
+def press(key):
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode=""))
+
+
+def run_benchmark(difficulty="Medium", digits=10, max_frames=20000, seed=0, output="bench_output.txt"):
+    game = SudokuGame()
+    game.generator = SudokuBoardGenerator(seed)
+    game.profiler = FrameProfiler(history=None)
+    # Frames are uncapped, but the solve animation keeps the game's own pacing so it spans many frames.
+    game.fps = 0
+
+    # Each scripted action is posted on its own frame, the way a player's input would arrive.
+    button = next(b for b in game.menu_buttons if b.text == difficulty)
+    click(button.rect.center)
+    game.run_frame()
+
+    empty_cells = list(zip(*np.nonzero(game.original_board == 0)))
+    rng = random.Random(seed)
+    for row, col in rng.sample(empty_cells, min(digits, len(empty_cells))):
+        click(cell_center(row, col))
+        game.run_frame()
+        press(pygame.K_0 + rng.randint(1, 9))
+        game.run_frame()
+
+    click(game.solve_button.rect.center)
+    frames = 0
+    while frames < max_frames:
+        game.run_frame()
+        frames += 1
+        if not game.solving_animation:
+            break
+
+    game.profiler.write_summary(output)
+    pygame.quit()
+    return game.profiler.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless frame-time benchmark of SudokuGame.run")
+    parser.add_argument("--difficulty", default="Medium", choices=["Easy", "Medium", "Hard", "Expert"])
+    parser.add_argument("--digits", type=int, default=10, help="number of digits typed before pressing Solve")
+    parser.add_argument("--max-frames", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_output.txt")
+    args = parser.parse_args()
+    summary = run_benchmark(args.difficulty, args.digits, args.max_frames, args.seed, args.output)
+    for name, stats in summary.items():
+        print(f"{name:>10}: p50 {stats['p50_ms']:.3f} ms  p90 {stats['p90_ms']:.3f} ms  "
+              f"p99 {stats['p99_ms']:.3f} ms  max {stats['max_ms']:.3f} ms  ({stats['count']} frames)")
+
+
+if __name__ == "__main__":
+    main()
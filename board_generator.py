@@ -1,12 +1,21 @@
 import numpy as np
 import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+from board_tables import get_tables
 
 #=========================== RANDOM BOARD GENERATOR BASED ON DIFFICULTY =================================#
 
+CELLS_TO_REMOVE = {"easy": 30, "medium": 40, "hard": 50, "expert": 60}
+
 class SudokuBoardGenerator:
-    def __init__(self):
+    def __init__(self, seed=None):
+        self.random = random.Random(seed)
         self.size = 9
         self.subgrid_size = 3
+        self.tables = get_tables(self.size)
         self.board = np.zeros((self.size, self.size), dtype=int)
     
     def generate_full_board(self):
@@ -20,7 +29,7 @@ class SudokuBoardGenerator:
             if c == self.size:
                 return backtrack_fill(r + 1, 0)
             numbers = list(range(1, self.size + 1))
-            random.shuffle(numbers)
+            self.random.shuffle(numbers)
             for num in numbers:
                 if self.is_valid(num, r, c):
                     self.board[r, c] = num
@@ -32,28 +41,18 @@ class SudokuBoardGenerator:
         backtrack_fill(0, 0)
     
     def is_valid(self, num, row, col):
-        if num in self.board[row, :] or num in self.board[:, col]:
-            return False
-        start_row, start_col = row - row % self.subgrid_size, col - col % self.subgrid_size
-        if num in self.board[start_row:start_row + self.subgrid_size, start_col:start_col + self.subgrid_size]:
+        if self.board[row, col] == num:
             return False
-        return True
+        return num not in self.board.ravel()[self.tables.peers[row * self.size + col]]
     
     def remove_numbers(self, difficulty):
-        if difficulty == "easy":
-            cells_to_remove = 30
-        elif difficulty == "medium":
-            cells_to_remove = 40
-        elif difficulty == "hard":
-            cells_to_remove = 50
-        elif difficulty == "expert":
-            cells_to_remove = 60
-        else:
+        if difficulty not in CELLS_TO_REMOVE:
             raise ValueError("Invalid difficulty level")
+        cells_to_remove = CELLS_TO_REMOVE[difficulty]
         
         removed = 0
         while removed < cells_to_remove:
-            row, col = random.randint(0, self.size - 1), random.randint(0, self.size - 1)
+            row, col = self.random.randint(0, self.size - 1), self.random.randint(0, self.size - 1)
             if self.board[row, col] != 0:
                 self.board[row, col] = 0
                 removed += 1
@@ -61,4 +60,54 @@ class SudokuBoardGenerator:
     def generate(self, difficulty="easy"):
         self.generate_full_board()
         self.remove_numbers(difficulty)
-        return self.board
\ No newline at end of file
+        return self.board
+
+#=========================== SEEDED BULK GENERATION ACROSS A WORKER POOL =================================#
+
+def _board_seed(entropy, index):
+    child = np.random.SeedSequence(entropy, spawn_key=(index,))
+    return int.from_bytes(child.generate_state(4, dtype=np.uint32).tobytes(), "little")
+
+def _generate_chunk(task):
+    entropy, start, count, difficulty = task
+    generator = SudokuBoardGenerator()
+    boards = []
+    for index in range(start, start + count):
+        generator.random.seed(_board_seed(entropy, index))
+        boards.append(generator.generate(difficulty))
+    return np.array(boards, dtype=np.int8)
+
+def _chunk_tasks(n, difficulty, seed, chunk_size):
+    # Every board gets its own stream derived from (seed, board index), so the output does not depend on
+    # which worker runs it, how many workers there are or how the boards are split into chunks.
+    entropy = np.random.SeedSequence(seed).entropy
+    for start in range(0, n, chunk_size):
+        yield entropy, start, min(chunk_size, n - start), difficulty
+
+def generate_many(n, difficulty="easy", seed=None, workers=None, chunk_size=256):
+    if difficulty not in CELLS_TO_REMOVE:
+        raise ValueError("Invalid difficulty level")
+    return _stream_boards(_chunk_tasks(n, difficulty, seed, chunk_size), workers or os.cpu_count() or 1)
+
+def _stream_boards(tasks, workers):
+    if workers == 1:
+        for task in tasks:
+            yield from _generate_chunk(task)
+        return
+    # Only a bounded window of chunks is in flight, so memory stays flat however large n is.
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(_generate_chunk, task))
+            if len(pending) >= 4 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+def generate_to_file(path, n, difficulty="easy", seed=None, workers=None, chunk_size=256):
+    count = 0
+    with open(path, "w") as f:
+        for board in generate_many(n, difficulty, seed, workers, chunk_size):
+            f.write("".join(map(str, board.ravel())) + "\n")
+            count += 1
+    return count
@@ -0,0 +1,50 @@
+import numpy as np
+from functools import lru_cache
+from math import isqrt
+
+#============================ PRECOMPUTED UNIT AND PEER TABLES =================================#
+
+class BoardTables:
+    def __init__(self, size):
+        self.size = size
+        self.subgrid_size = isqrt(size)
+        if self.subgrid_size * self.subgrid_size != size:
+            raise ValueError("Board size must be a perfect square")
+        sub = self.subgrid_size
+        cells = np.arange(size * size)
+
+        # Flat index -> row, column and box number, plus the (row, col) tuple for code that works in coordinates.
+        self.rows = cells // size
+        self.cols = cells % size
+        self.boxes = (self.rows // sub) * sub + self.cols // sub
+        self.coords = tuple((int(r), int(c)) for r, c in zip(self.rows, self.cols))
+
+        # Units are ordered row 0, column 0, row 1, column 1, ... followed by the boxes left to right, top to bottom.
+        units = []
+        for i in range(size):
+            units.append(cells[self.rows == i])
+            units.append(cells[self.cols == i])
+        for b in range(size):
+            units.append(cells[self.boxes == b])
+        self.units = np.array(units)
+        self.unit_cells = tuple(tuple(self.coords[i] for i in unit) for unit in self.units)
+
+        # Each cell's row, column and box unit numbers, indexing into self.units.
+        self.cell_units = np.stack([2 * self.rows, 2 * self.cols + 1, 2 * size + self.boxes], axis=1)
+
+        same_unit = ((self.rows[:, None] == self.rows[None, :]) |
+                     (self.cols[:, None] == self.cols[None, :]) |
+                     (self.boxes[:, None] == self.boxes[None, :]))
+        np.fill_diagonal(same_unit, False)
+        self.peers = np.array([np.nonzero(row)[0] for row in same_unit])
+
+        for table in (self.rows, self.cols, self.boxes, self.units, self.cell_units, self.peers):
+            table.flags.writeable = False
+
+    def index(self, row, col):
+        return row * self.size + col
+
+
+@lru_cache(maxsize=None)
+def get_tables(size=9):
+    return BoardTables(size)
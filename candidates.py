@@ -0,0 +1,69 @@
+import numpy as np
+
+from board_tables import get_tables
+
+#============================ INCREMENTAL CANDIDATE TRACKING FOR PENCIL MARKS =================================#
+
+class CandidateTracker:
+    def __init__(self, board, size=9):
+        self.size = size
+        tables = get_tables(size)
+        # Plain lists are faster than numpy for the handful of scalar lookups done per edit.
+        self.peers = tables.peers.tolist()
+        self.cell_units = tables.cell_units.tolist()
+        self.version = 0
+        self.load(board)
+
+    def load(self, board):
+        self.values = [int(value) for value in np.asarray(board).ravel()]
+        # Digit counts per unit rather than bitmasks, so clearing one of two clashing entries keeps the digit used.
+        self.unit_counts = [[0] * (self.size + 1) for _ in range(3 * self.size)]
+        for cell, value in enumerate(self.values):
+            if value:
+                for unit in self.cell_units[cell]:
+                    self.unit_counts[unit][value] += 1
+        self.masks = [self.compute_mask(cell) for cell in range(self.size * self.size)]
+        self.version += 1
+
+    def compute_mask(self, cell):
+        if self.values[cell]:
+            return 0
+        row, col, box = (self.unit_counts[unit] for unit in self.cell_units[cell])
+        mask = 0
+        for digit in range(1, self.size + 1):
+            if not (row[digit] or col[digit] or box[digit]):
+                mask |= 1 << digit
+        return mask
+
+    def set_value(self, row, col, value):
+        cell = row * self.size + col
+        old = self.values[cell]
+        if old == value:
+            return
+        for unit in self.cell_units[cell]:
+            if old:
+                self.unit_counts[unit][old] -= 1
+            if value:
+                self.unit_counts[unit][value] += 1
+        self.values[cell] = value
+        # Only the edited cell and its peers can gain or lose candidates.
+        self.masks[cell] = self.compute_mask(cell)
+        for peer in self.peers[cell]:
+            self.masks[peer] = self.compute_mask(peer)
+        self.version += 1
+
+    def most_constrained_cell(self):
+        # The empty cell with the fewest candidates, or None when the board is full; a dead end returns early.
+        best, best_count = None, self.size + 1
+        for cell, (value, mask) in enumerate(zip(self.values, self.masks)):
+            if not value:
+                count = bin(mask).count("1")
+                if count < best_count:
+                    best, best_count = cell, count
+                    if count <= 1:
+                        break
+        return best
+
+    def candidates(self, row, col):
+        mask = self.masks[row * self.size + col]
+        return [digit for digit in range(1, self.size + 1) if mask >> digit & 1]
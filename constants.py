@@ -16,6 +16,9 @@ MODAL_WIDTH = 400
 MODAL_HEIGHT = 250
 CONGRATS_BUTTON_WIDTH = 150
 CONGRATS_BUTTON_HEIGHT = 50
+SOLVE_TARGET_DURATION = 3000
+SOLVE_FRAME_BUDGET = 4
+FAST_FORWARD_SPEED = 8
 
 # Colors
 PASTEL_BLUE = (176, 208, 242)
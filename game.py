@@ -1,6 +1,7 @@
 import pygame
 import sys
 import time
+import threading
 import numpy as np
 from pygame import gfxdraw
 import random
@@ -9,6 +10,10 @@ import constants as c
 from button import Button, draw_rounded_rect
 from board_generator import SudokuBoardGenerator
 from solver import SudokuSolver
+from board_tables import get_tables
+from profiler import FrameProfiler
+from animation import SolveAnimator
+from candidates import CandidateTracker
 
 #============================ CREATE WINDOWS AND ACTUAL GAME PLAYING =================================#
 class SudokuGame:
@@ -17,10 +22,12 @@ class SudokuGame:
         pygame.display.set_caption("Sudoku")
         self.clock = pygame.time.Clock()
         self.generator = SudokuBoardGenerator()
+        self.tables = get_tables(c.GRID_SIZE)
         self.current_screen = "menu"
         self.selected_cell = None
         self.game_board = None
         self.original_board = None
+        self.candidate_tracker = None
         self.start_time = None
         self.elapsed_time = 0
         self.initialize_buttons()
@@ -30,7 +37,16 @@ class SudokuGame:
         self.solver = None
         self.solving_animation = False
         self.solving_delay = 50
-        self.last_solve_step = 0
+        self.animator = None
+        self.solver_thread = None
+        self.solver_result = None
+        self.fps = 60
+        self.profiler = FrameProfiler()
+        self.show_notes = False
+        self.notes_layer = None
+        self.notes_layer_version = None
+        notes_font = pygame.font.Font(None, 18)
+        self.note_glyphs = {d: notes_font.render(str(d), True, c.GRAY) for d in range(1, c.GRID_SIZE + 1)}
         
     def initialize_buttons(self):
         self.menu_buttons = []
@@ -44,10 +60,15 @@ class SudokuGame:
         self.back_button = Button(20, 20, 100, 40, "Back")
         self.solve_button = Button(c.WINDOW_WIDTH - 240, 20, 100, 40, "Solve")
         self.reset_button = Button(c.WINDOW_WIDTH - 120, 20, 100, 40, "Reset")
+        self.notes_button = Button(140, 20, 100, 40, "Notes")
+        self.fast_button = Button(c.WINDOW_WIDTH // 2 - 110, c.WINDOW_HEIGHT - 55, 100, 40, "Fast")
+        self.skip_button = Button(c.WINDOW_WIDTH // 2 + 10, c.WINDOW_HEIGHT - 55, 100, 40, "Skip")
         
     def start_game(self, difficulty):
       self.game_board = self.generator.generate(difficulty.lower())
       self.original_board = np.copy(self.game_board) 
+      self.candidate_tracker = CandidateTracker(self.game_board, c.GRID_SIZE)
+      self.notes_layer_version = None
       self.current_screen = "game"
       self.start_time = time.time()
         
@@ -65,8 +86,8 @@ class SudokuGame:
       if len(self.errors) > 0:  
           return False
           
-      for i in range(c.c.GRID_SIZE):
-          for j in range(c.c.GRID_SIZE):
+      for i in range(c.GRID_SIZE):
+          for j in range(c.GRID_SIZE):
               if self.game_board[i][j] == 0:
                   return False
       return True
@@ -114,28 +135,10 @@ class SudokuGame:
           self.clashing_cells.clear()
           return True
           
-      clashing = set()
-      is_valid = True
-      
-      # Check row
-      for j in range(c.c.GRID_SIZE):
-          if j != col and self.game_board[row][j] == value:
-              clashing.add((row, j))
-              is_valid = False
-              
-      # Check column
-      for i in range(c.c.GRID_SIZE):
-          if i != row and self.game_board[i][col] == value:
-              clashing.add((i, col))
-              is_valid = False
-              
-      # Check 3x3 box
-      box_row, box_col = 3 * (row // 3), 3 * (col // 3)
-      for i in range(box_row, box_row + 3):
-          for j in range(box_col, box_col + 3):
-              if (i != row or j != col) and self.game_board[i][j] == value:
-                  clashing.add((i, j))
-                  is_valid = False
+      # Check row, column and 3x3 box in one pass over the cell's peers
+      peers = self.tables.peers[self.tables.index(row, col)]
+      clashing = {self.tables.coords[p] for p in peers[self.game_board.ravel()[peers] == value]}
+      is_valid = not clashing
       
       # Update error and clashing cells sets
       if not is_valid:
@@ -148,6 +151,9 @@ class SudokuGame:
       return is_valid
 
     def handle_key_input(self, key):
+      if key == pygame.K_n:
+          self.toggle_notes()
+          return
       if self.selected_cell:
           row, col = self.selected_cell
           if self.original_board[row][col] != 0: 
@@ -156,6 +162,7 @@ class SudokuGame:
           if key in range(pygame.K_1, pygame.K_9 + 1):
               num = key - pygame.K_0
               self.game_board[row][col] = num
+              self.candidate_tracker.set_value(row, col, num)
               self.validate_cell(row, col, num)
               
               if self.is_board_complete():
@@ -165,8 +172,12 @@ class SudokuGame:
                   
           elif key == pygame.K_BACKSPACE or key == pygame.K_0:
               self.game_board[row][col] = 0
+              self.candidate_tracker.set_value(row, col, 0)
               self.validate_cell(row, col, 0)
 
+    def toggle_notes(self):
+        self.show_notes = not self.show_notes
+
     def draw_grid(self):
         grid_width = c.GRID_SIZE * c.CELL_SIZE
         grid_height = c.GRID_SIZE * c.CELL_SIZE
@@ -196,6 +207,9 @@ class SudokuGame:
                 
                 pygame.draw.rect(self.screen, c.BLACK, cell_rect, 1)
         
+        if self.show_notes and self.candidate_tracker is not None:
+            self.draw_notes(start_x, start_y)
+        
         for i in range(4):
             thick_line_pos = i * (c.CELL_SIZE * 3)
             pygame.draw.line(self.screen, c.BLACK, 
@@ -205,8 +219,25 @@ class SudokuGame:
                           (start_x, start_y + thick_line_pos),
                           (start_x + grid_width, start_y + thick_line_pos), 3)
     
+    def draw_notes(self, start_x, start_y):
+        # Notes are drawn onto a transparent layer that is only rebuilt when the candidates change,
+        # so an unchanged board costs a single blit per frame.
+        if self.notes_layer_version != self.candidate_tracker.version:
+            grid_size = c.GRID_SIZE * c.CELL_SIZE
+            self.notes_layer = pygame.Surface((grid_size, grid_size), pygame.SRCALPHA)
+            sub_size = c.CELL_SIZE // 3
+            for i in range(c.GRID_SIZE):
+                for j in range(c.GRID_SIZE):
+                    for digit in self.candidate_tracker.candidates(i, j):
+                        glyph = self.note_glyphs[digit]
+                        center = (j * c.CELL_SIZE + ((digit - 1) % 3) * sub_size + sub_size // 2 + 1,
+                                  i * c.CELL_SIZE + ((digit - 1) // 3) * sub_size + sub_size // 2 + 1)
+                        self.notes_layer.blit(glyph, glyph.get_rect(center=center))
+            self.notes_layer_version = self.candidate_tracker.version
+        self.screen.blit(self.notes_layer, (start_x, start_y))
+    
     def solve_step(self):
-        if not hasattr(self, 'solver_steps'):
+        if self.animator is None and self.solver_thread is None:
             solver = SudokuSolver(self.game_board)
             
             self.valid_entries = np.zeros_like(self.game_board, dtype=bool)
@@ -216,37 +247,67 @@ class SudokuGame:
                         self.valid_entries[i][j] = True
             
             self.user_entries = np.where(self.valid_entries, self.game_board, 0)
-            self.solver_steps = solver.get_solving_steps()
-            self.current_step = 0
+            # Solving can take tens of milliseconds, so it runs on a thread while frames keep being drawn.
+            self.solver_result = []
+            self.solver_thread = threading.Thread(target=self.compute_solving_steps,
+                                                  args=(solver, self.solver_result), daemon=True)
+            self.solver_thread.start()
             return
         
-        current_time = pygame.time.get_ticks()
-        if current_time - self.last_solve_step >= self.solving_delay:
-            if self.current_step < len(self.solver_steps):
-                step = self.solver_steps[self.current_step]
-                row, col, value = step
-                
-                if not self.valid_entries[row][col] and not self.original_board[row][col]:
-                    self.game_board[row][col] = value
-                
-                self.current_step += 1
-                self.last_solve_step = current_time
-            else:
-                self.solving_animation = False
-                self.errors.clear()
-                self.clashing_cells.clear()
-                delattr(self, 'solver_steps')
+        if self.animator is None:
+            if not self.solver_result:
+                return
+            self.animator = SolveAnimator(self.solver_result[0], self.apply_solve_step, self.solving_delay,
+                                          c.SOLVE_TARGET_DURATION, c.SOLVE_FRAME_BUDGET, c.FAST_FORWARD_SPEED)
+            self.animator.start(pygame.time.get_ticks())
+            self.solver_thread = None
+            self.solver_result = None
+            return
+        
+        self.animator.advance(pygame.time.get_ticks())
+        if self.animator.done:
+            self.solving_animation = False
+            self.errors.clear()
+            self.clashing_cells.clear()
+            self.animator = None
+            self.fast_button.text = "Fast"
+    
+    def compute_solving_steps(self, solver, result):
+        # A result is always delivered, so a solver error ends the animation instead of leaving it waiting.
+        steps = []
+        try:
+            steps = solver.get_solving_steps()
+        finally:
+            result.append(steps)
+    
+    def apply_solve_step(self, row, col, value):
+        if not self.valid_entries[row][col] and not self.original_board[row][col]:
+            self.game_board[row][col] = value
+            self.candidate_tracker.set_value(row, col, value)
     
     def solve_game(self):
         self.solving_animation = True
-        self.last_solve_step = pygame.time.get_ticks()
+    
+    def fast_forward_solve(self):
+        if self.animator is not None:
+            self.animator.toggle_fast_forward()
+            self.fast_button.text = "Normal" if self.animator.fast_forwarding else "Fast"
+    
+    def skip_solve(self):
+        if self.animator is not None:
+            self.animator.skip()
     
     def draw_game(self):
         self.screen.fill(c.PASTEL_BLUE)
-        self.draw_grid()
+        with self.profiler.phase("draw_grid"):
+            self.draw_grid()
         self.back_button.draw(self.screen)
         self.solve_button.draw(self.screen)
         self.reset_button.draw(self.screen)
+        self.notes_button.draw(self.screen)
+        if self.solving_animation:
+            self.fast_button.draw(self.screen)
+            self.skip_button.draw(self.screen)
         
         if self.start_time:
             self.elapsed_time = time.time() - self.start_time
@@ -273,6 +334,7 @@ class SudokuGame:
 
     def reset_game(self):
       self.game_board = self.original_board.copy()
+      self.candidate_tracker.load(self.game_board)
       self.start_time = time.time()
       self.selected_cell = None
       self.errors.clear() 
@@ -282,59 +344,95 @@ class SudokuGame:
         self.selected_cell = None
         self.game_board = None
         self.original_board = None
+        self.candidate_tracker = None
         self.start_time = None
         self.elapsed_time = 0
         self.errors.clear()
         self.clashing_cells.clear()
-        if hasattr(self, 'solver_steps'):
-            delattr(self, 'solver_steps')
+        self.animator = None
+        self.solver_thread = None
+        self.solver_result = None
+        self.fast_button.text = "Fast"
         self.solving_animation = False
 
-    def run(self):
-        running = True
-        while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    mouse_pos = pygame.mouse.get_pos()
-                    
-                    if self.current_screen == "menu":
-                        for button in self.menu_buttons:
-                            if button.rect.collidepoint(mouse_pos):
-                                self.start_game(button.text)
-                    
-                    elif self.current_screen == "game":
-                        if self.back_button.rect.collidepoint(mouse_pos):
-                            self.return_to_menu()
-                        elif self.reset_button.rect.collidepoint(mouse_pos):
-                            self.reset_game()
-                        elif self.solve_button.rect.collidepoint(mouse_pos):
-                            self.solve_game()
-                        else:
-                            self.handle_cell_click(mouse_pos)
-                    
-                    elif self.current_screen == "congratulations":
-                        continue_button = self.draw_congratulations()
-                        if continue_button.rect.collidepoint(mouse_pos):
-                            self.return_to_menu()
-                
-                elif event.type == pygame.KEYDOWN and self.current_screen == "game" and not self.solving_animation:
-                    self.handle_key_input(event.key)
+    def handle_event(self, event):
+        if event.type == pygame.QUIT:
+            return False
+        
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            mouse_pos = event.pos
             
             if self.current_screen == "menu":
-                self.draw_menu()
+                for button in self.menu_buttons:
+                    if button.rect.collidepoint(mouse_pos):
+                        self.start_game(button.text)
+            
             elif self.current_screen == "game":
-                if self.solving_animation:
+                if self.back_button.rect.collidepoint(mouse_pos):
+                    self.return_to_menu()
+                elif self.reset_button.rect.collidepoint(mouse_pos):
+                    self.reset_game()
+                elif self.solve_button.rect.collidepoint(mouse_pos):
+                    self.solve_game()
+                elif self.notes_button.rect.collidepoint(mouse_pos):
+                    self.toggle_notes()
+                elif self.solving_animation and self.fast_button.rect.collidepoint(mouse_pos):
+                    self.fast_forward_solve()
+                elif self.solving_animation and self.skip_button.rect.collidepoint(mouse_pos):
+                    self.skip_solve()
+                else:
+                    self.handle_cell_click(mouse_pos)
+            
+            elif self.current_screen == "congratulations":
+                continue_button = self.draw_congratulations()
+                if continue_button.rect.collidepoint(mouse_pos):
+                    self.return_to_menu()
+        
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            self.profiler.toggle_overlay()
+        
+        elif event.type == pygame.KEYDOWN and self.current_screen == "game" and self.solving_animation:
+            if event.key == pygame.K_f:
+                self.fast_forward_solve()
+            elif event.key == pygame.K_s:
+                self.skip_solve()
+        
+        elif event.type == pygame.KEYDOWN and self.current_screen == "game":
+            self.handle_key_input(event.key)
+        return True
+
+    def run_frame(self):
+        self.profiler.start_frame()
+        running = True
+        with self.profiler.phase("events"):
+            for event in pygame.event.get():
+                running = self.handle_event(event) and running
+        
+        if self.current_screen == "menu":
+            with self.profiler.phase("draw"):
+                self.draw_menu()
+        elif self.current_screen == "game":
+            if self.solving_animation:
+                with self.profiler.phase("solve_step"):
                     self.solve_step()
+            with self.profiler.phase("draw"):
                 self.draw_game()
-            elif self.current_screen == "congratulations":
+        elif self.current_screen == "congratulations":
+            with self.profiler.phase("draw"):
                 self.draw_game()
                 self.draw_congratulations()
-            
+        self.profiler.draw_overlay(self.screen)
+        
+        with self.profiler.phase("flip"):
             pygame.display.flip()
-            self.clock.tick(60)
+        self.profiler.end_frame()
+        self.clock.tick(self.fps)
+        return running
+
+    def run(self):
+        running = True
+        while running:
+            running = self.run_frame()
         
         pygame.quit()
         sys.exit()
\ No newline at end of file
@@ -0,0 +1,89 @@
+import json
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+import pygame
+
+import constants as c
+
+#============================ PER-FRAME PHASE TIMINGS AND ON-SCREEN OVERLAY =================================#
+
+class FrameProfiler:
+    def __init__(self, history=600):
+        # The live overlay only needs a recent window; history=None keeps every frame, as the benchmark needs.
+        self.history = history
+        self.samples = defaultdict(lambda: deque(maxlen=self.history))
+        self.frame_phases = {}
+        self.frame_start = None
+        self.frames = 0
+        self.overlay_visible = False
+        self.overlay_surface = None
+        self.overlay_refreshed = 0
+        self.overlay_interval = 0.25
+        self.font = None
+
+    def start_frame(self):
+        self.frame_phases = {}
+        self.frame_start = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.frame_phases[name] = self.frame_phases.get(name, 0.0) + time.perf_counter() - start
+
+    def end_frame(self):
+        if self.frame_start is None:
+            return
+        self.frame_phases["frame"] = time.perf_counter() - self.frame_start
+        for name, seconds in self.frame_phases.items():
+            self.samples[name].append(seconds * 1000)
+        self.frames += 1
+        self.frame_start = None
+
+    def summary(self):
+        result = {}
+        for name, values in self.samples.items():
+            data = np.fromiter(values, dtype=float)
+            p50, p90, p99 = np.percentile(data, [50, 90, 99])
+            result[name] = {"count": len(data),
+                            "mean_ms": round(float(data.mean()), 4),
+                            "p50_ms": round(float(p50), 4),
+                            "p90_ms": round(float(p90), 4),
+                            "p99_ms": round(float(p99), 4),
+                            "max_ms": round(float(data.max()), 4)}
+        return result
+
+    def write_summary(self, path):
+        with open(path, "w") as f:
+            json.dump({"frames": self.frames, "phases": self.summary()}, f, indent=2)
+
+    def toggle_overlay(self):
+        self.overlay_visible = not self.overlay_visible
+        self.overlay_surface = None
+
+    def draw_overlay(self, surface):
+        if not self.overlay_visible:
+            return
+        # Re-rendering text every frame would show up in the numbers being displayed, so refresh a few times a second.
+        now = time.perf_counter()
+        if self.overlay_surface is None or now - self.overlay_refreshed >= self.overlay_interval:
+            self.overlay_surface = self.render_overlay()
+            self.overlay_refreshed = now
+        surface.blit(self.overlay_surface, (5, 80))
+
+    def render_overlay(self):
+        if self.font is None:
+            self.font = pygame.font.Font(None, 20)
+        lines = ["phase   p50 / p99 ms"]
+        for name, stats in self.summary().items():
+            lines.append(f"{name}: {stats['p50_ms']:.2f} / {stats['p99_ms']:.2f}")
+        overlay = pygame.Surface((165, 8 + 18 * len(lines)), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 160))
+        for i, line in enumerate(lines):
+            overlay.blit(self.font.render(line, True, c.WHITE), (6, 4 + 18 * i))
+        return overlay
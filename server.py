@@ -0,0 +1,400 @@
+import argparse
+import asyncio
+import functools
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from board_generator import SudokuBoardGenerator
+from board_tables import get_tables
+from validator import validate_boards
+from solver import SudokuSolver, SearchLimitExceeded
+from candidates import CandidateTracker
+
+#============================ LOCAL JSON SOLVE SERVICE WITH REQUEST BATCHING =================================#
+
+DIFFICULTIES = ("easy", "medium", "hard", "expert")
+SOLVE_NODE_LIMIT = 500000
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           500: "Internal Server Error", 503: "Service Unavailable"}
+
+# Solver and generator objects are kept per worker process, so a batch only pays for the work itself.
+_worker_solver = None
+_worker_generator = None
+
+
+def conflict_cells(mask):
+    tables = get_tables(9)
+    return [tables.coords[i] for i in np.flatnonzero(mask)]
+
+
+def find_conflicts(grid):
+    return conflict_cells(validate_boards(np.asarray(grid)[None]).conflicts[0])
+
+
+def has_dead_cell(grid):
+    tracker = CandidateTracker(grid)
+    return any(value == 0 and mask == 0 for value, mask in zip(tracker.values, tracker.masks))
+
+
+def solve_grid(grid, max_nodes=SOLVE_NODE_LIMIT):
+    global _worker_solver
+    if find_conflicts(grid):
+        return {"solved": False, "grid": grid, "reason": "grid has conflicting entries"}
+    if has_dead_cell(grid):
+        return {"solved": False, "grid": grid, "reason": "an empty cell has no candidates"}
+    if _worker_solver is None:
+        _worker_solver = SudokuSolver(grid)
+    solver = _worker_solver
+
+    def reset():
+        solver.grid = np.array(grid)
+        solver.trail.clear()
+
+    reset()
+    try:
+        while not solver.is_solved():
+            if not (solver.single_candidate() or solver.hidden_single() or solver.naked_pairs()):
+                break
+        if not solver.is_solved():
+            solver.backtrack_solve(max_nodes)
+        # Propagation can place digits that no solution contains, so retry from the submitted grid with search alone.
+        if not solver.is_solved() or find_conflicts(solver.grid):
+            reset()
+            solver.backtrack_solve(max_nodes)
+    except SearchLimitExceeded as e:
+        return {"solved": False, "grid": grid, "reason": str(e)}
+    if not solver.is_solved():
+        return {"solved": False, "grid": grid, "reason": "grid has no solution"}
+    return {"solved": True, "grid": solver.grid.tolist()}
+
+
+def generate_grid(difficulty):
+    global _worker_generator
+    if _worker_generator is None:
+        _worker_generator = SudokuBoardGenerator()
+    return {"difficulty": difficulty, "grid": _worker_generator.generate(difficulty).tolist()}
+
+
+def validate_grids(grids):
+    result = validate_boards(np.array(grids))
+    return [{"valid": bool(valid), "complete": bool(complete),
+             "conflicts": [list(cell) for cell in conflict_cells(mask)]}
+            for valid, complete, mask in zip(result.well_formed, result.complete, result.conflicts)]
+
+
+def validate_grid(grid):
+    return validate_grids([grid])[0]
+
+
+HANDLERS = {"solve": solve_grid, "generate": generate_grid, "validate": validate_grid}
+
+
+def run_batch(jobs):
+    results = [None] * len(jobs)
+    # All validations in a batch are checked together with one vectorized call. If that fails, they are left
+    # to the per-job loop below, so one bad grid only fails its own request.
+    validations = [i for i, (kind, _) in enumerate(jobs) if kind == "validate"]
+    if validations:
+        try:
+            for i, result in zip(validations, validate_grids([jobs[i][1] for i in validations])):
+                results[i] = (True, result)
+        except Exception:
+            pass
+    for i, (kind, arg) in enumerate(jobs):
+        if results[i] is not None:
+            continue
+        try:
+            results[i] = (True, HANDLERS[kind](arg))
+        except Exception as e:
+            results[i] = (False, str(e))
+    return results
+
+
+def parse_grid(payload):
+    grid = payload.get("grid") if isinstance(payload, dict) else None
+    if (not isinstance(grid, list) or len(grid) != 9 or
+            any(not isinstance(row, list) or len(row) != 9 for row in grid) or
+            any(type(value) is not int or not 0 <= value <= 9 for row in grid for value in row)):
+        raise ValueError("'grid' must be a 9x9 list of integers between 0 and 9")
+    return grid
+
+
+def parse_difficulty(payload):
+    difficulty = payload.get("difficulty", "easy") if isinstance(payload, dict) else "easy"
+    if difficulty not in DIFFICULTIES:
+        raise ValueError(f"'difficulty' must be one of {', '.join(DIFFICULTIES)}")
+    return difficulty
+
+
+ROUTES = {"/solve": ("solve", parse_grid),
+          "/generate": ("generate", parse_difficulty),
+          "/validate": ("validate", parse_grid)}
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+class QueueFull(Exception):
+    pass
+
+
+class SudokuServer:
+    def __init__(self, host="127.0.0.1", port=8000, workers=None, max_batch=32, max_wait=0.005,
+                 max_queue=256, max_inflight=None, executor=None, batch_timeout=30.0):
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self.max_inflight = max_inflight or self.workers
+        self.batch_timeout = batch_timeout
+        self.executor = executor
+        self.own_executor = executor is None
+        self.server = None
+        self.queue = None
+        self.slots = None
+        self.batch_task = None
+        self.dispatch_tasks = set()
+        self.latencies = {kind: deque(maxlen=1024) for kind in HANDLERS}
+        self.counts = {"requests": 0, "rejected": 0, "errors": 0, "batches": 0, "batched_jobs": 0}
+        self.max_queue_depth = 0
+        self.inflight = 0
+
+    def make_executor(self):
+        # Forked workers would inherit open client sockets and keep those connections from closing.
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else None)
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+
+    def replace_broken_executor(self, broken):
+        # A worker that dies marks the whole pool broken; swap in a fresh one unless another batch already did.
+        if self.own_executor and self.executor is broken:
+            broken.shutdown(wait=False, cancel_futures=True)
+            self.executor = self.make_executor()
+
+    async def start(self):
+        if self.executor is None:
+            self.executor = self.make_executor()
+        self.queue = asyncio.Queue(maxsize=self.max_queue)
+        self.slots = asyncio.Semaphore(self.max_inflight)
+        self.batch_task = asyncio.create_task(self.batch_loop())
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.batch_task:
+            self.batch_task.cancel()
+            try:
+                await self.batch_task
+            except asyncio.CancelledError:
+                pass
+        if self.own_executor and self.executor:
+            # Waiting for the workers to exit happens off the event loop.
+            shutdown = functools.partial(self.executor.shutdown, cancel_futures=True)
+            self.executor = None
+            await asyncio.get_running_loop().run_in_executor(None, shutdown)
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.close()
+
+    #------------------------------ batching ------------------------------#
+
+    def submit(self, kind, arg):
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((kind, arg, future))
+        except asyncio.QueueFull:
+            raise QueueFull() from None
+        self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+        return future
+
+    async def batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Only pull a new batch when a pool slot is free, so excess load backs up into the bounded queue.
+            await self.slots.acquire()
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                if not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            task = asyncio.create_task(self.dispatch(batch))
+            self.dispatch_tasks.add(task)
+            task.add_done_callback(self.dispatch_tasks.discard)
+
+    async def dispatch(self, batch):
+        self.inflight += 1
+        self.counts["batches"] += 1
+        self.counts["batched_jobs"] += len(batch)
+        jobs = [(kind, arg) for kind, arg, _ in batch]
+        try:
+            executor = self.executor
+            try:
+                results = await self.run_jobs(executor, jobs)
+            except BrokenProcessPool:
+                self.replace_broken_executor(executor)
+                results = await self.run_jobs(self.executor, jobs)
+        except asyncio.TimeoutError:
+            results = [(False, f"batch timed out after {self.batch_timeout}s")] * len(batch)
+        except Exception as e:
+            results = [(False, f"worker failure: {e}")] * len(batch)
+        finally:
+            self.inflight -= 1
+            self.slots.release()
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def run_jobs(self, executor, jobs):
+        # The timeout frees the slot for a stuck batch; its worker is bounded by the solver's node budget.
+        future = asyncio.get_running_loop().run_in_executor(executor, run_batch, jobs)
+        return await asyncio.wait_for(future, self.batch_timeout)
+
+    #------------------------------ metrics ------------------------------#
+
+    def metrics(self):
+        latency = {}
+        for kind, values in self.latencies.items():
+            latency[kind] = {"count": len(values),
+                             "p50_ms": round(percentile(values, 50), 3),
+                             "p95_ms": round(percentile(values, 95), 3),
+                             "p99_ms": round(percentile(values, 99), 3)}
+        batches = self.counts["batches"]
+        return {"latency": latency,
+                "queue": {"depth": self.queue.qsize() if self.queue else 0,
+                          "max_depth": self.max_queue_depth,
+                          "limit": self.max_queue},
+                "batches": {"dispatched": batches,
+                            "inflight": self.inflight,
+                            "mean_size": round(self.counts["batched_jobs"] / batches, 3) if batches else 0.0},
+                "requests": {key: self.counts[key] for key in ("requests", "rejected", "errors")}}
+
+    #------------------------------ HTTP ------------------------------#
+
+    async def handle_connection(self, reader, writer):
+        try:
+            status, body = await self.handle_request(reader)
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            status, body = 400, {"error": "malformed HTTP request"}
+        data = json.dumps(body).encode()
+        headers = [f"HTTP/1.1 {status} {REASONS[status]}",
+                   "Content-Type: application/json",
+                   f"Content-Length: {len(data)}",
+                   "Connection: close"]
+        if status == 503:
+            headers.append("Retry-After: 1")
+        try:
+            writer.write(("\r\n".join(headers) + "\r\n\r\n").encode() + data)
+            await writer.drain()
+            writer.close()
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+    async def handle_request(self, reader):
+        method, path, _ = (await reader.readline()).decode("latin-1").split(" ", 2)
+        length = 0
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value.strip())
+        raw = await reader.readexactly(length) if length else b""
+
+        if path == "/metrics":
+            if method != "GET":
+                return 405, {"error": "use GET"}
+            return 200, self.metrics()
+        if path not in ROUTES:
+            return 404, {"error": f"unknown endpoint {path}"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+
+        kind, parse = ROUTES[path]
+        self.counts["requests"] += 1
+        started = time.perf_counter()
+        try:
+            arg = parse(json.loads(raw) if raw else {})
+        except ValueError as e:
+            self.counts["errors"] += 1
+            return 400, {"error": str(e)}
+        try:
+            ok, result = await self.submit(kind, arg)
+        except QueueFull:
+            self.counts["rejected"] += 1
+            return 503, {"error": "server busy, queue is full"}
+        self.latencies[kind].append((time.perf_counter() - started) * 1000)
+        if not ok:
+            self.counts["errors"] += 1
+            return 500, {"error": result}
+        return 200, result
+
+
+async def request_json(host, port, method, path, payload=None):
+    reader, writer = await asyncio.open_connection(host, port)
+    data = json.dumps(payload).encode() if payload is not None else b""
+    writer.write((f"{method} {path} HTTP/1.1\r\nHost: {host}\r\n"
+                  f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n").encode() + data)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value.strip())
+    body = json.loads(await reader.readexactly(length))
+    writer.close()
+    await writer.wait_closed()
+    return status, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Sudoku solve/generate/validate JSON server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--max-queue", type=int, default=256)
+    parser.add_argument("--batch-timeout", type=float, default=30.0)
+    args = parser.parse_args()
+    server = SudokuServer(args.host, args.port, args.workers, args.max_batch,
+                          args.max_wait_ms / 1000, args.max_queue, batch_timeout=args.batch_timeout)
+    asyncio.run(server.serve_forever())
+
+
+if __name__ == "__main__":
+    main()
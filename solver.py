@@ -1,12 +1,33 @@
 import numpy as np
 
+from board_tables import get_tables
+from candidates import CandidateTracker
+
 
 #============================ SUDOKU SOLVER =================================#
+class SearchLimitExceeded(Exception):
+    pass
+
 class SudokuSolver:
     def __init__(self, grid):
         self.grid = np.array(grid)
         self.size = 9
         self.subgrid_size = 3
+        self.tables = get_tables(self.size)
+        self.trail = []
+
+    def place(self, row, col, num):
+        self.grid[row, col] = num
+        self.trail.append((row, col, num))
+
+    def undo(self, mark):
+        # Pops the trail back to `mark`, clearing those cells, and returns the clears in the order applied.
+        undone = []
+        while len(self.trail) > mark:
+            row, col, _ = self.trail.pop()
+            self.grid[row, col] = 0
+            undone.append((row, col, 0))
+        return undone
 
     def find_empty_cell(self):
         for row in range(self.size):
@@ -16,44 +37,37 @@ class SudokuSolver:
         return None
 
     def is_valid(self, num, row, col):
-        if num in self.grid[row, :] or num in self.grid[:, col]:
-            return False
-        start_row, start_col = row - row % self.subgrid_size, col - col % self.subgrid_size
-        if num in self.grid[start_row:start_row + self.subgrid_size, start_col:start_col + self.subgrid_size]:
+        if self.grid[row, col] == num:
             return False
-        return True
+        return num not in self.grid.ravel()[self.tables.peers[row * self.size + col]]
 
     def get_candidates(self, row, col):
         return [num for num in range(1, self.size + 1) if self.is_valid(num, row, col)]
 
     def single_candidate(self):
-        
-        changed = False
+        start = len(self.trail)
         for row in range(self.size):
             for col in range(self.size):
                 if self.grid[row, col] == 0:
                     candidates = self.get_candidates(row, col)
                     if len(candidates) == 1:
-                        self.grid[row, col] = candidates[0]
-                        changed = True
-        return changed
+                        self.place(row, col, candidates[0])
+        return self.trail[start:]
 
     def hidden_single(self):
-        changed = False
+        start = len(self.trail)
         for num in range(1, self.size + 1):
             for i in range(self.size):
                 row_positions = [(i, j) for j in range(self.size) if self.grid[i, j] == 0 and self.is_valid(num, i, j)]
                 if len(row_positions) == 1:
-                    self.grid[row_positions[0]] = num
-                    changed = True
+                    self.place(*row_positions[0], num)
                 col_positions = [(j, i) for j in range(self.size) if self.grid[j, i] == 0 and self.is_valid(num, j, i)]
                 if len(col_positions) == 1:
-                    self.grid[col_positions[0]] = num
-                    changed = True
-        return changed
+                    self.place(*col_positions[0], num)
+        return self.trail[start:]
 
     def naked_pairs(self):
-        changed = False
+        start = len(self.trail)
         for unit in self.get_units():
             pairs = {}
             for cell in unit:
@@ -70,19 +84,11 @@ class SudokuSolver:
                             if self.grid[row, col] == 0:
                                 for num in pair:
                                     if num in self.get_candidates(row, col):
-                                        self.grid[row, col] = num
-                                        changed = True
-        return changed
+                                        self.place(row, col, num)
+        return self.trail[start:]
     
     def get_units(self):
-        units = []
-        for i in range(self.size):
-            units.append([(i, j) for j in range(self.size)])  
-            units.append([(j, i) for j in range(self.size)])  
-        for r in range(0, self.size, self.subgrid_size):
-            for c in range(0, self.size, self.subgrid_size):
-                units.append([(r + i, c + j) for i in range(self.subgrid_size) for j in range(self.subgrid_size)])
-        return units
+        return self.tables.unit_cells
 
     def solve(self):
         self.display()
@@ -100,66 +106,67 @@ class SudokuSolver:
     def is_solved(self):
         return all(self.grid[row, col] != 0 for row in range(self.size) for col in range(self.size))
 
-    def backtrack_solve(self):
-        empty_cell = self.find_empty_cell()
-        if not empty_cell:
-            return True
-        row, col = empty_cell
-        for num in self.get_candidates(row, col):
-            self.grid[row, col] = num
-            if self.backtrack_solve():
+    def backtrack_solve(self, max_nodes=None):
+        # Branches on the empty cell with the fewest candidates, tracked incrementally as cells are filled.
+        # With max_nodes set, the search gives up with SearchLimitExceeded after that many placements,
+        # leaving the grid as it was before the call.
+        tracker = CandidateTracker(self.grid, self.size)
+        nodes = 0
+
+        def search():
+            nonlocal nodes
+            cell = tracker.most_constrained_cell()
+            if cell is None:
                 return True
-            self.grid[row, col] = 0
-        return False
+            row, col = divmod(cell, self.size)
+            for num in tracker.candidates(row, col):
+                nodes += 1
+                if max_nodes is not None and nodes > max_nodes:
+                    raise SearchLimitExceeded(f"search gave up after {max_nodes} placements")
+                mark = len(self.trail)
+                self.place(row, col, num)
+                tracker.set_value(row, col, num)
+                if search():
+                    return True
+                self.undo(mark)
+                tracker.set_value(row, col, 0)
+            return False
+
+        mark = len(self.trail)
+        try:
+            return search()
+        except SearchLimitExceeded:
+            self.undo(mark)
+            raise
   
     def get_solving_steps(self):
-      steps = []
-      
-      def backtrack_solve_with_steps(self):
-          empty_cell = self.find_empty_cell()
-          if not empty_cell:
-              return True
-          
-          row, col = empty_cell
-          for num in self.get_candidates(row, col):
-              self.grid[row, col] = num
-              steps.append((row, col, num))
-              
-              if backtrack_solve_with_steps(self):
-                  return True
-                  
-              self.grid[row, col] = 0
-              steps.append((row, col, 0))  
-          return False
-      
-     
-      while True:
-          initial_grid = self.grid.copy()
-          if self.single_candidate():
-              for i in range(self.size):
-                  for j in range(self.size):
-                      if self.grid[i, j] != initial_grid[i, j]:
-                          steps.append((i, j, self.grid[i, j]))
-              continue
-              
-          if self.hidden_single():
-              for i in range(self.size):
-                  for j in range(self.size):
-                      if self.grid[i, j] != initial_grid[i, j]:
-                          steps.append((i, j, self.grid[i, j]))
-              continue
-              
-          if self.naked_pairs():
-              for i in range(self.size):
-                  for j in range(self.size):
-                      if self.grid[i, j] != initial_grid[i, j]:
-                          steps.append((i, j, self.grid[i, j]))
-              continue
-              
-          break
-      
-      if not self.is_solved():
-          backtrack_solve_with_steps(self)
-      
-      return steps
-    
\ No newline at end of file
+        steps = []
+
+        def backtrack_solve_with_steps():
+            empty_cell = self.find_empty_cell()
+            if not empty_cell:
+                return True
+
+            row, col = empty_cell
+            for num in self.get_candidates(row, col):
+                mark = len(self.trail)
+                self.place(row, col, num)
+                steps.append((row, col, num))
+
+                if backtrack_solve_with_steps():
+                    return True
+
+                steps.extend(self.undo(mark))
+            return False
+
+        # Each technique returns the placements it made, so no grid snapshots or diffs are needed.
+        while True:
+            placed = self.single_candidate() or self.hidden_single() or self.naked_pairs()
+            if not placed:
+                break
+            steps.extend(placed)
+
+        if not self.is_solved():
+            backtrack_solve_with_steps()
+
+        return steps
\ No newline at end of file
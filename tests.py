@@ -1,10 +1,19 @@
 import unittest
+import asyncio
+import os
+import signal
 import numpy as np
 
 from io import StringIO
-from board_generator import SudokuBoardGenerator
-from solver import SudokuSolver
+from board_generator import SudokuBoardGenerator, generate_many
+from solver import SudokuSolver, SearchLimitExceeded
 from game import SudokuGame
+from server import SudokuServer, request_json, run_batch, solve_grid
+from profiler import FrameProfiler
+from board_tables import get_tables
+from animation import SolveAnimator, collapse_steps
+from candidates import CandidateTracker
+from validator import validate_boards
 
 class TestSudokuBoard(unittest.TestCase):
     def setUp(self):
@@ -44,6 +53,25 @@ class TestSudokuBoard(unittest.TestCase):
                 self.assertTrue(check_unit(box))
                 print(f"Box check passed at position ({i},{j})")
 
+    def test_seeded_generation(self):
+        print("\nTesting seeded generation...")
+        np.testing.assert_array_equal(SudokuBoardGenerator(42).generate("hard"),
+                                      SudokuBoardGenerator(42).generate("hard"))
+        
+    def test_generate_many_is_worker_independent(self):
+        print("\nTesting bulk generation across worker counts...")
+        serial = np.array(list(generate_many(40, "medium", seed=3, workers=1, chunk_size=8)))
+        parallel = np.array(list(generate_many(40, "medium", seed=3, workers=3, chunk_size=8)))
+        print(f"Generated {len(serial)} boards")
+        self.assertEqual(serial.shape, (40, 9, 9))
+        np.testing.assert_array_equal(serial, parallel)
+        rechunked = np.array(list(generate_many(40, "medium", seed=3, workers=2, chunk_size=5)))
+        np.testing.assert_array_equal(serial, rechunked)
+        self.assertTrue(all(np.count_nonzero(board) == 41 for board in serial))
+        self.assertEqual(len({board.tobytes() for board in serial}), 40)
+        with self.assertRaises(ValueError):
+            generate_many(1, "impossible")
+
 class TestSudokuSolver(unittest.TestCase):
     def setUp(self):
         self.test_board = np.array([
@@ -101,6 +129,158 @@ class TestSudokuSolver(unittest.TestCase):
             self.assertEqual(col_sum, 45)
             print(f"Row {i} sum: {row_sum}, Column {i} sum: {col_sum}")
 
+    def test_steps_replay_to_solution(self):
+        print("\nTesting replay of recorded steps...")
+        steps = self.solver.get_solving_steps()
+        replay = self.test_board.copy()
+        for row, col, value in steps:
+            replay[row, col] = value
+        np.testing.assert_array_equal(replay, self.solver.grid)
+        self.assertTrue(self.solver.is_solved())
+        print(f"Replayed {len(steps)} steps, trail holds {len(self.solver.trail)} placements")
+        
+    def test_trail_undo(self):
+        print("\nTesting trail undo...")
+        mark = len(self.solver.trail)
+        placed = self.solver.single_candidate()
+        self.assertTrue(placed)
+        self.assertEqual(self.solver.trail[mark:], placed)
+        undone = self.solver.undo(mark)
+        self.assertEqual(len(undone), len(placed))
+        np.testing.assert_array_equal(self.solver.grid, self.test_board)
+        self.assertEqual(len(self.solver.trail), mark)
+
+    def test_search_limit(self):
+        print("\nTesting search node budget...")
+        with self.assertRaises(SearchLimitExceeded):
+            self.solver.backtrack_solve(max_nodes=5)
+        np.testing.assert_array_equal(self.solver.grid, self.test_board)
+        self.assertEqual(self.solver.trail, [])
+        self.assertTrue(self.solver.backtrack_solve(max_nodes=10000))
+
+class TestBoardTables(unittest.TestCase):
+    def test_tables(self):
+        print("\nTesting precomputed board tables...")
+        tables = get_tables(9)
+        self.assertIs(tables, get_tables(9))
+        self.assertEqual(tables.peers.shape, (81, 20))
+        self.assertEqual(tables.units.shape, (27, 9))
+        peers = {tables.coords[p] for p in tables.peers[tables.index(4, 4)]}
+        self.assertNotIn((4, 4), peers)
+        self.assertTrue({(4, 0), (0, 4), (3, 3), (5, 5)} <= peers)
+        for cell, units in enumerate(tables.cell_units):
+            for unit in units:
+                self.assertIn(cell, tables.units[unit])
+        with self.assertRaises(ValueError):
+            tables.peers[0, 0] = 1
+
+class TestSolveAnimation(unittest.TestCase):
+    def setUp(self):
+        self.puzzle = SudokuBoardGenerator(5).generate("expert")
+        self.steps = SudokuSolver(self.puzzle.copy()).get_solving_steps()
+
+    def replay(self, steps):
+        board = self.puzzle.copy()
+        for row, col, value in steps:
+            board[row, col] = value
+        return board
+
+    def test_collapse_keeps_final_board(self):
+        print("\nTesting step collapsing...")
+        collapsed = collapse_steps(self.steps)
+        print(f"Collapsed {len(self.steps)} steps to {len(collapsed)}")
+        self.assertLessEqual(len(collapsed), len(self.steps))
+        np.testing.assert_array_equal(self.replay(collapsed), self.replay(self.steps))
+        self.assertEqual(collapse_steps([(0, 0, 4), (0, 1, 5), (0, 1, 0), (0, 0, 0), (0, 2, 7)]), [(0, 2, 7)])
+        self.assertEqual(collapse_steps([(0, 0, 4), (0, 0, 6), (0, 0, 0)]), [(0, 0, 4), (0, 0, 6), (0, 0, 0)])
+
+    def test_pacing_and_skip(self):
+        print("\nTesting animation pacing and skip...")
+        board = self.puzzle.copy()
+        def apply_step(row, col, value):
+            board[row, col] = value
+        animator = SolveAnimator(self.steps, apply_step, step_delay=50, target_duration=1000)
+        animator.start(0)
+        self.assertEqual(animator.advance(0), 0)
+        first = animator.advance(100)
+        self.assertGreaterEqual(first, 2)
+        animator.toggle_fast_forward()
+        self.assertTrue(animator.fast_forwarding)
+        self.assertGreaterEqual(animator.advance(200), min(first * 4, len(animator.steps) - first))
+        animator.skip()
+        self.assertTrue(animator.done)
+        np.testing.assert_array_equal(board, self.replay(self.steps))
+
+class TestCandidateTracker(unittest.TestCase):
+    def test_incremental_matches_full_scan(self):
+        print("\nTesting incremental candidate tracking...")
+        board = SudokuBoardGenerator(11).generate("hard")
+        tracker = CandidateTracker(board)
+        rng = np.random.default_rng(11)
+        for _ in range(60):
+            row, col = rng.integers(0, 9, size=2)
+            value = int(rng.integers(0, 10))
+            board[row, col] = value
+            tracker.set_value(row, col, value)
+            solver = SudokuSolver(board)
+            for i in range(9):
+                for j in range(9):
+                    expected = solver.get_candidates(i, j) if board[i, j] == 0 else []
+                    self.assertEqual(tracker.candidates(i, j), expected)
+        print(f"Tracker checked after 60 edits, version {tracker.version}")
+
+class TestBatchValidator(unittest.TestCase):
+    def setUp(self):
+        self.solution = SudokuSolver(SudokuBoardGenerator(21).generate("easy"))
+        self.solution.backtrack_solve()
+        self.puzzle = self.solution.grid.copy()
+        self.puzzle[:, ::2] = 0
+
+    def test_validate_boards(self):
+        print("\nTesting batch validation...")
+        solved = self.solution.grid
+        clash = solved.copy()
+        clash[0, 0], clash[0, 1] = clash[0, 1], clash[0, 1]
+        out_of_range = solved.copy()
+        out_of_range[4, 4] = 12
+        boards = np.array([solved, self.puzzle, clash, out_of_range, np.zeros((9, 9), dtype=int)])
+        result = validate_boards(boards, self.puzzle)
+        print(f"Well formed: {result.well_formed}, complete: {result.complete}")
+
+        self.assertEqual(result.well_formed.tolist(), [True, True, False, False, True])
+        self.assertEqual(result.complete.tolist(), [True, False, False, False, False])
+        self.assertEqual(result.consistent.tolist(), [True, True, True, True, False])
+        self.assertEqual(result.conflicts.shape, (5, 9, 9))
+        self.assertFalse(result.conflicts[[0, 1, 3, 4]].any())
+        # The duplicated digit clashes in row 0 and, when both copies share a box, in that box too.
+        self.assertTrue(result.conflicts[2, 0, 0] and result.conflicts[2, 0, 1])
+        self.assertIsNone(validate_boards(boards).consistent)
+        with self.assertRaises(ValueError):
+            validate_boards(np.zeros((2, 9, 8)))
+        
+        fractional = solved.astype(float)
+        fractional[2, 2] = 1.5
+        result = validate_boards(np.array([solved.astype(float), fractional, np.full((9, 9), 1.5)]))
+        self.assertEqual(result.well_formed.tolist(), [True, False, False])
+        self.assertEqual(result.complete.tolist(), [True, False, False])
+        with self.assertRaises(ValueError):
+            validate_boards(np.full((1, 9, 9), "1"))
+
+    def test_matches_cell_validation(self):
+        print("\nTesting batch validation against per-cell checks...")
+        rng = np.random.default_rng(21)
+        boards = rng.integers(0, 10, size=(50, 9, 9))
+        result = validate_boards(boards, chunk_size=7)
+        for board, mask in zip(boards, result.conflicts):
+            solver = SudokuSolver(board)
+            for i in range(9):
+                for j in range(9):
+                    value = board[i, j]
+                    solver.grid[i, j] = 0
+                    expected = value != 0 and not solver.is_valid(value, i, j)
+                    solver.grid[i, j] = value
+                    self.assertEqual(mask[i, j], expected)
+
 class TestGameIntegration(unittest.TestCase):
     def setUp(self):
         self.game = SudokuGame()
@@ -170,12 +350,180 @@ class TestGameIntegration(unittest.TestCase):
         self.assertEqual(len(self.game.errors), 0)
         print("Game reset successful")
 
+    def test_frame_profiling(self):
+        print("\nTesting frame profiler...")
+        self.game.fps = 0
+        self.game.start_game("easy")
+        self.game.solve_game()
+        for _ in range(5):
+            self.game.run_frame()
+        summary = self.game.profiler.summary()
+        print(f"Profiled phases: {sorted(summary)}")
+        for phase in ("events", "solve_step", "draw_grid", "draw", "flip", "frame"):
+            self.assertIn(phase, summary)
+        self.assertEqual(summary["frame"]["count"], 5)
+        self.assertGreaterEqual(summary["frame"]["p99_ms"], summary["draw_grid"]["p50_ms"])
+        
+    def test_solve_animation_runs_across_frames(self):
+        print("\nTesting background solve and animation...")
+        self.game.fps = 0
+        self.game.solving_delay = 0
+        self.game.generator = SudokuBoardGenerator(8)
+        self.game.start_game("hard")
+        self.game.solve_game()
+        frames = 0
+        while self.game.solving_animation and frames < 2000:
+            self.game.run_frame()
+            frames += 1
+        print(f"Solve finished after {frames} frames")
+        self.assertFalse(self.game.solving_animation)
+        self.assertIsNone(self.game.solver_thread)
+        self.assertEqual(np.count_nonzero(self.game.game_board == 0), 0)
+        
+    def test_unbounded_profiler_history(self):
+        print("\nTesting unbounded profiler history...")
+        bounded, unbounded = FrameProfiler(history=10), FrameProfiler(history=None)
+        for profiler in (bounded, unbounded):
+            for _ in range(25):
+                profiler.start_frame()
+                with profiler.phase("draw"):
+                    pass
+                profiler.end_frame()
+        self.assertEqual(bounded.summary()["frame"]["count"], 10)
+        for stats in unbounded.summary().values():
+            self.assertEqual(stats["count"], unbounded.frames)
+        self.assertEqual(unbounded.frames, 25)
+
+class TestSolveServer(unittest.TestCase):
+    def setUp(self):
+        self.test_board = [
+            [5,3,0,0,7,0,0,0,0],
+            [6,0,0,1,9,5,0,0,0],
+            [0,9,8,0,0,0,0,6,0],
+            [8,0,0,0,6,0,0,0,3],
+            [4,0,0,8,0,3,0,0,1],
+            [7,0,0,0,2,0,0,0,6],
+            [0,6,0,0,0,0,2,8,0],
+            [0,0,0,4,1,9,0,0,5],
+            [0,0,0,0,8,0,0,7,9]
+        ]
+
+    def run_with_server(self, scenario, **options):
+        async def main():
+            server = await SudokuServer(port=0, workers=1, **options).start()
+            try:
+                return await scenario(server)
+            finally:
+                await server.close()
+        return asyncio.run(main())
+
+    def test_endpoints(self):
+        print("\nTesting solve server endpoints...")
+        async def scenario(server):
+            call = lambda *args: request_json(server.host, server.port, *args)
+            return await asyncio.gather(
+                call("POST", "/solve", {"grid": self.test_board}),
+                call("POST", "/generate", {"difficulty": "medium"}),
+                call("POST", "/validate", {"grid": self.test_board}),
+                call("POST", "/solve", {"grid": [[0] * 9]}),
+                call("GET", "/metrics"))
+        solved, generated, validated, bad, metrics = self.run_with_server(scenario)
+
+        self.assertEqual(solved[0], 200)
+        self.assertTrue(solved[1]["solved"])
+        grid = np.array(solved[1]["grid"])
+        for i in range(9):
+            self.assertEqual(sorted(grid[i, :]), list(range(1, 10)))
+            self.assertEqual(sorted(grid[:, i]), list(range(1, 10)))
+        self.assertEqual(generated[0], 200)
+        self.assertEqual(np.count_nonzero(generated[1]["grid"]), 41)
+        self.assertEqual(validated[1], {"valid": True, "complete": False, "conflicts": []})
+        self.assertEqual(bad[0], 400)
+        self.assertEqual(metrics[0], 200)
+        self.assertIn("queue", metrics[1])
+        print(f"Metrics: {metrics[1]}")
+
+    def test_solve_grid_seeded_puzzles(self):
+        print("\nTesting solve_grid on seeded puzzles...")
+        for difficulty in ["easy", "medium", "hard", "expert"]:
+            for seed in range(40 if difficulty != "expert" else 12):
+                puzzle = SudokuBoardGenerator(seed).generate(difficulty)
+                result = solve_grid(puzzle.tolist())
+                self.assertTrue(result["solved"], f"{difficulty} seed {seed}: {result.get('reason')}")
+                validation = validate_boards(np.array([result["grid"]]), puzzle)
+                self.assertTrue(validation.complete[0])
+                self.assertTrue(validation.consistent[0])
+
+    def test_unsolvable_grids_are_rejected(self):
+        print("\nTesting rejection of unsolvable grids...")
+        dead_cell = [[0] * 9 for _ in range(9)]
+        dead_cell[8] = [1, 2, 3, 4, 5, 6, 7, 8, 0]
+        dead_cell[0][8] = 9
+        result = solve_grid(dead_cell)
+        self.assertFalse(result["solved"])
+        self.assertEqual(result["grid"], dead_cell)
+        self.assertFalse(solve_grid([[0] * 9 for _ in range(9)], max_nodes=10)["solved"])
+
+    def test_batch_failure_is_isolated(self):
+        print("\nTesting isolation of failing jobs in a batch...")
+        results = run_batch([("validate", self.test_board), ("validate", [[1, 2, 3]]),
+                             ("solve", self.test_board), ("generate", "easy")])
+        self.assertEqual([ok for ok, _ in results], [True, False, True, True])
+        self.assertTrue(results[0][1]["valid"])
+        self.assertTrue(results[2][1]["solved"])
+
+    def test_recovers_from_dead_worker(self):
+        print("\nTesting recovery from a killed worker...")
+        async def scenario(server):
+            call = lambda: request_json(server.host, server.port, "POST", "/generate", {"difficulty": "easy"})
+            first = await call()
+            broken = server.executor
+            for pid in list(broken._processes):
+                os.kill(pid, signal.SIGKILL)
+            responses = [await call() for _ in range(3)]
+            return first, responses, server.executor is not broken
+        first, responses, replaced = self.run_with_server(scenario)
+        self.assertEqual(first[0], 200)
+        self.assertEqual([status for status, _ in responses], [200] * 3)
+        self.assertTrue(replaced)
+
+    def test_batch_timeout_releases_slot(self):
+        print("\nTesting batch timeout...")
+        async def scenario(server):
+            call = lambda: request_json(server.host, server.port, "POST", "/solve", {"grid": self.test_board})
+            timed_out = await call()
+            server.batch_timeout = 30.0
+            return timed_out, await call(), server.metrics()
+        timed_out, solved, metrics = self.run_with_server(scenario, max_inflight=1, batch_timeout=0)
+        self.assertNotEqual(timed_out[0], 200)
+        self.assertEqual(solved[0], 200)
+        self.assertEqual(metrics["batches"]["inflight"], 0)
+
+    def test_backpressure(self):
+        print("\nTesting queue backpressure...")
+        async def scenario(server):
+            requests = [request_json(server.host, server.port, "POST", "/solve", {"grid": self.test_board})
+                        for _ in range(20)]
+            responses = await asyncio.gather(*requests)
+            return responses, server.metrics()
+        responses, metrics = self.run_with_server(scenario, max_batch=1, max_queue=1)
+        statuses = [status for status, _ in responses]
+        print(f"Response statuses: {statuses}")
+        self.assertIn(503, statuses)
+        self.assertTrue(all(body["solved"] for status, body in responses if status == 200))
+        self.assertEqual(metrics["requests"]["rejected"], statuses.count(503))
+
 def run_tests():
     # Create a test suite
     suite = unittest.TestSuite()
     suite.addTest(unittest.makeSuite(TestSudokuBoard))
     suite.addTest(unittest.makeSuite(TestSudokuSolver))
+    suite.addTest(unittest.makeSuite(TestBoardTables))
+    suite.addTest(unittest.makeSuite(TestSolveAnimation))
+    suite.addTest(unittest.makeSuite(TestCandidateTracker))
+    suite.addTest(unittest.makeSuite(TestBatchValidator))
     suite.addTest(unittest.makeSuite(TestGameIntegration))
+    suite.addTest(unittest.makeSuite(TestSolveServer))
     
     # Create a runner that will store the output
     stream = StringIO()
@@ -0,0 +1,52 @@
+import numpy as np
+from collections import namedtuple
+from math import isqrt
+
+#============================ VECTORIZED BATCH VALIDATION OF (N, 9, 9) BOARDS =================================#
+
+# well_formed: values in range and no digit repeated in a unit; complete: well formed with no empty cells;
+# conflicts: per-cell mask of entries that repeat in their row, column or box; consistent: agrees with the
+# puzzle's clues, or None when no puzzles were given.
+BatchValidation = namedtuple("BatchValidation", ["well_formed", "complete", "conflicts", "consistent"])
+
+
+def conflict_mask(boards, size=9):
+    n = len(boards)
+    sub = isqrt(size)
+    onehot = boards[..., None] == np.arange(1, size + 1, dtype=boards.dtype)
+    row_dup = onehot.sum(axis=2, dtype=np.uint8) > 1
+    col_dup = onehot.sum(axis=1, dtype=np.uint8) > 1
+    # Viewed as (box row, row in box, box column, column in box, digit), boxes are sums over axes 2 and 4.
+    blocks = onehot.reshape(n, sub, sub, sub, sub, size)
+    box_dup = blocks.sum(axis=(2, 4), dtype=np.uint8) > 1
+    in_dup_box = (blocks & box_dup[:, :, None, :, None, :]).reshape(n, size, size, size)
+    return (onehot & (row_dup[:, :, None, :] | col_dup[:, None, :, :]) | in_dup_box).any(axis=3)
+
+
+def validate_boards(boards, puzzles=None, size=9, chunk_size=65536):
+    boards = np.asarray(boards)
+    if boards.ndim != 3 or boards.shape[1:] != (size, size):
+        raise ValueError(f"Expected an array of shape (N, {size}, {size}), got {boards.shape}")
+    if not (np.issubdtype(boards.dtype, np.integer) or np.issubdtype(boards.dtype, np.floating)):
+        raise ValueError(f"Expected an integer or float array, got dtype {boards.dtype}")
+
+    # The one-hot expansion is size times larger than the boards, so large batches are processed in chunks.
+    conflicts = np.zeros(boards.shape, dtype=bool)
+    for start in range(0, len(boards), chunk_size):
+        conflicts[start:start + chunk_size] = conflict_mask(boards[start:start + chunk_size], size)
+
+    in_range = ((boards >= 0) & (boards <= size)).all(axis=(1, 2))
+    # Float boards are accepted, but only whole-number values count as digits; NaN fails both checks.
+    if np.issubdtype(boards.dtype, np.floating):
+        in_range &= (boards == np.round(boards)).all(axis=(1, 2))
+    well_formed = in_range & ~conflicts.any(axis=(1, 2))
+    complete = well_formed & (boards != 0).all(axis=(1, 2))
+
+    consistent = None
+    if puzzles is not None:
+        puzzles = np.asarray(puzzles)
+        if puzzles.shape not in ((size, size), boards.shape):
+            raise ValueError(f"Expected puzzles of shape ({size}, {size}) or {boards.shape}, got {puzzles.shape}")
+        consistent = ((puzzles == 0) | (boards == puzzles)).all(axis=(1, 2))
+
+    return BatchValidation(well_formed, complete, conflicts, consistent)